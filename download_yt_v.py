@@ -1,14 +1,99 @@
-from yt_dlp import YoutubeDL
 import os
 import json
-from datetime import datetime, timedelta
-import pytz
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, time as dtime
+from zoneinfo import ZoneInfo
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+IST = ZoneInfo('Asia/Kolkata')
+
+# Background writer so the transcript write overlaps metadata serialization
+_IO_POOL = ThreadPoolExecutor(max_workers=2)
+
+# track_file -> (mtime_ns, processed list, set of processed urls)
+_TRACK_CACHE: dict[str, tuple[int, list, set]] = {}
+
+
+def _load_track(track_file):
+    """Return (processed, seen_urls), reparsing only when the file changed on disk."""
+    try:
+        mtime = os.stat(track_file).st_mtime_ns
+    except FileNotFoundError:
+        return [], set()
+
+    cached = _TRACK_CACHE.get(track_file)
+    if cached and cached[0] == mtime:
+        return cached[1], cached[2]
+
+    try:
+        if orjson:
+            with open(track_file, 'rb') as f:
+                processed = orjson.loads(f.read())
+        else:
+            with open(track_file, 'r', encoding='utf-8') as f:
+                processed = json.load(f)
+    except Exception:
+        print("⚠️ process_track.json is corrupted, resetting...")
+        return [], set()
+
+    seen_urls = {item.get('url') for item in processed}
+    _TRACK_CACHE[track_file] = (mtime, processed, seen_urls)
+    return processed, seen_urls
+
+
+def _caption_text(lines):
+    """Join caption lines, skipping cue numbers and "00:00 --> 00:02" timing lines."""
+    parts = []
+    append = parts.append
+    for line in lines:
+        s = line.strip()
+        if s and '-->' not in s and not s.isdigit():
+            append(s)
+    return ' '.join(parts)
+
+
+def _fmt_date(dt):
+    """Format dt as DD-MM-YYYY without going through strftime/locale."""
+    return f"{dt.day:02d}-{dt.month:02d}-{dt.year}"
+
+
+def _fmt_ist(dt, seconds=False):
+    """Format dt as 'DD-MM-YYYY HH:MM[:SS] AM/PM IST' without strftime."""
+    hour = dt.hour % 12 or 12
+    ampm = 'AM' if dt.hour < 12 else 'PM'
+    sec = f":{dt.second:02d}" if seconds else ""
+    return f"{_fmt_date(dt)} {hour:02d}:{dt.minute:02d}{sec} {ampm} IST"
+
+
+def _write_text(path, text):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+
+
+def _save_track(track_file, processed, seen_urls):
+    """Write the tracker compactly and atomically, then refresh the in-memory cache."""
+    tmp = track_file + '.tmp'
+    if orjson:
+        with open(tmp, 'wb') as f:
+            f.write(orjson.dumps(processed))
+    else:
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(processed, f, separators=(',', ':'), ensure_ascii=False)
+    os.replace(tmp, track_file)
+    _TRACK_CACHE[track_file] = (os.stat(track_file).st_mtime_ns, processed, seen_urls)
+
 
 def get_yt(url, save_path='.'):
     """
     Download YouTube video, transcript, and save metadata to JSON.
     Now includes cookie authentication for Render-safe deployment.
     """
+    # yt_dlp is slow to import; only pay for it when actually downloading
+    from yt_dlp import YoutubeDL
 
     result = {
         'title': None,
@@ -28,42 +113,39 @@ def get_yt(url, save_path='.'):
     transcript_file = os.path.join(save_path, "yt_transcript.txt")
     track_file = os.path.join(save_path, "process_track.json")
 
-    ist = pytz.timezone('Asia/Kolkata')
-    now_ist = datetime.now(ist)
+    now_ist = datetime.now(IST)
 
     # ✅ Load tracking
-    processed = []
-    if os.path.exists(track_file):
-        try:
-            with open(track_file, 'r', encoding='utf-8') as f:
-                processed = json.load(f)
-        except Exception:
-            print("⚠️ process_track.json is corrupted, resetting...")
+    processed, seen_urls = _load_track(track_file)
 
     # ✅ Next schedule logic
-    next_date = now_ist.replace(hour=6, minute=30, second=0, microsecond=0)
-    if next_date <= now_ist:
-        next_date += timedelta(days=1)
+    today_630 = datetime.combine(now_ist.date(), dtime(6, 30), tzinfo=IST)
+    next_date = today_630 if today_630 > now_ist else today_630 + timedelta(days=1)
 
-    schedule_date = next_date.strftime("%d-%m-%Y")
-    schedule_datetime = next_date.strftime("%d-%m-%Y %I:%M %p IST")
+    schedule_date = _fmt_date(next_date)
+    schedule_datetime = _fmt_ist(next_date)
     print(f"📅 Scheduled for: {schedule_datetime}")
 
     # ✅ Skip duplicates
-    if any(item.get('url') == url for item in processed):
+    if url in seen_urls:
         print("⚠️ Already processed. Skipping.")
         return result
 
     # ✅ Clean up
     for f in [video_file, json_file, transcript_file]:
-        if os.path.exists(f):
+        try:
             os.remove(f)
             print(f"🧹 Deleted: {os.path.basename(f)}")
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"⚠️ Could not delete {os.path.basename(f)}: {e}")
 
     try:
         # ✅ Use cookies.txt (upload your exported file to project root)
         cookie_path = os.path.join(save_path, "cookies.txt")
-        if not os.path.exists(cookie_path):
+        has_cookies = os.path.exists(cookie_path)
+        if not has_cookies:
             print("⚠️ cookies.txt not found — YouTube may block download.")
 
         ydl_opts = {
@@ -75,7 +157,8 @@ def get_yt(url, save_path='.'):
             'writesubtitles': True,
             'writeautomaticsub': True,
             'subtitleslangs': ['en'],
-            'cookiefile': cookie_path if os.path.exists(cookie_path) else None,
+            'subtitlesformat': 'json3/vtt/best',
+            'cookiefile': cookie_path if has_cookies else None,
         }
 
         with YoutubeDL(ydl_opts) as ydl:
@@ -88,26 +171,20 @@ def get_yt(url, save_path='.'):
         # ✅ Transcript (if captions exist)
         transcript_text = ""
         try:
-            subs = info_dict.get('subtitles') or info_dict.get('automatic_captions') or {}
-            if 'en' in subs:
-                for sub in subs['en']:
-                    if 'url' in sub:
-                        sub_data = YoutubeDL().urlopen(sub['url']).read().decode('utf-8', errors='ignore')
-                        for line in sub_data.split('\n'):
-                            if '-->' not in line and line.strip() and not line.strip().isdigit():
-                                transcript_text += line.strip() + " "
-                        break
+            # yt-dlp already wrote the subtitle file; read it instead of fetching again
+            sub = (info_dict.get('requested_subtitles') or {}).get('en')
+            if sub and sub.get('filepath'):
+                with open(sub['filepath'], 'r', encoding='utf-8', errors='ignore') as f:
+                    transcript_text = _caption_text(f)
             else:
                 print("⚠️ No English subtitles available.")
         except Exception as e:
             print(f"⚠️ Subtitle parse failed: {e}")
 
-        # ✅ Save transcript
+        # ✅ Save transcript (in the background, overlapping the metadata write)
+        transcript_write = None
         if transcript_text:
-            with open(transcript_file, 'w', encoding='utf-8') as f:
-                f.write(transcript_text.strip())
-            result['transcript_file'] = transcript_file
-            print("✅ Transcript saved.")
+            transcript_write = _IO_POOL.submit(_write_text, transcript_file, transcript_text)
         else:
             print("⚠️ No transcript found.")
 
@@ -120,15 +197,22 @@ def get_yt(url, save_path='.'):
             'has_transcript': bool(transcript_text),
             'schedule_date': schedule_date,
             'schedule_time': schedule_datetime,
-            'processed_at': now_ist.strftime("%d-%m-%Y %I:%M:%S %p IST")
+            'processed_at': _fmt_ist(now_ist, seconds=True)
         }
-        with open(json_file, 'w', encoding='utf-8') as f:
-            json.dump(metadata, f, indent=4, ensure_ascii=False)
+        if orjson:
+            with open(json_file, 'wb') as f:
+                f.write(orjson.dumps(metadata, option=orjson.OPT_INDENT_2))
+        else:
+            with open(json_file, 'w', encoding='utf-8') as f:
+                json.dump(metadata, f, indent=4, ensure_ascii=False)
+
+        if transcript_write:
+            transcript_write.result()
+            result['transcript_file'] = transcript_file
+            print("✅ Transcript saved.")
 
         # ✅ Update tracker
-        processed.append(metadata)
-        with open(track_file, 'w', encoding='utf-8') as f:
-            json.dump(processed, f, indent=4, ensure_ascii=False)
+        _save_track(track_file, processed + [metadata], seen_urls | {url})
 
         print("✅ Download and save complete.")
 
@@ -2,25 +2,43 @@ from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
 from googleapiclient.http import MediaFileUpload
 from google.auth.transport.requests import Request
+from google.oauth2.credentials import Credentials
 import pickle
 import os
 import json
 import time
 import traceback
-from datetime import datetime, timedelta, time as dtime
+from datetime import datetime, timedelta, timezone, time as dtime
+from zoneinfo import ZoneInfo
 
 SCOPES = ['https://www.googleapis.com/auth/youtube.upload']
+IST = ZoneInfo('Asia/Kolkata')
+
+# Built client, reused until shortly before its access token expires
+_YT_CLIENT = {'svc': None, 'exp': 0}
 
 
 def authenticate_youtube():
     """Authenticate once and reuse token automatically (no manual re-verify)."""
+    if _YT_CLIENT['svc'] and time.time() < _YT_CLIENT['exp'] - 60:
+        return _YT_CLIENT['svc']
+
     creds = None
-    token_file = 'token.pickle'
+    token_file = 'token.json'
+    legacy_token_file = 'token.pickle'
+
+    # One-time migration from the pickled token older versions wrote
+    if not os.path.exists(token_file) and os.path.exists(legacy_token_file):
+        with open(legacy_token_file, 'rb') as token:
+            legacy_creds = pickle.load(token)
+        with open(token_file, 'w', encoding='utf-8') as token:
+            token.write(legacy_creds.to_json())
+        os.remove(legacy_token_file)
+        print("🔁 Migrated token.pickle to token.json.")
 
     # Load existing credentials if available
     if os.path.exists(token_file):
-        with open(token_file, 'rb') as token:
-            creds = pickle.load(token)
+        creds = Credentials.from_authorized_user_file(token_file, SCOPES)
 
     # If no credentials or expired
     if not creds or not creds.valid:
@@ -32,16 +50,20 @@ def authenticate_youtube():
             flow = InstalledAppFlow.from_client_secrets_file('secrect_code.json', SCOPES)
             creds = flow.run_local_server(port=0)
         # Save for next runs
-        with open(token_file, 'wb') as token:
-            pickle.dump(creds, token)
+        with open(token_file, 'w', encoding='utf-8') as token:
+            token.write(creds.to_json())
 
-    return build('youtube', 'v3', credentials=creds)
+    # Bundled discovery document is used, so skip the discovery file cache
+    _YT_CLIENT['svc'] = build('youtube', 'v3', credentials=creds, cache_discovery=False)
+    # creds.expiry is a naive UTC datetime
+    _YT_CLIENT['exp'] = creds.expiry.replace(tzinfo=timezone.utc).timestamp() if creds.expiry else 0
+    return _YT_CLIENT['svc']
 
 
 def get_next_upload_time():
-    """Return next 7:35 AM — today if not passed, else tomorrow."""
-    now = datetime.now()
-    scheduled_time = datetime.combine(now.date(), dtime(7, 35))
+    """Return next 7:35 AM IST — today if not passed, else tomorrow."""
+    now = datetime.now(IST)
+    scheduled_time = datetime.combine(now.date(), dtime(7, 35), tzinfo=IST)
     if now >= scheduled_time:
         scheduled_time += timedelta(days=1)
     print(f"📅 Next upload: {scheduled_time.strftime('%Y-%m-%d %I:%M %p')}")
@@ -97,14 +119,14 @@ def prepare_video_details(metadata=None):
 
 
 def upload_video(video_file='output_video.mp4', info_file='yt_metadata.json'):
-    """Upload one video, scheduled for next 7:35 AM."""
+    """Upload one video, scheduled for next 7:35 AM IST."""
     try:
         if not os.path.exists(video_file):
             return {'error': f'File not found: {video_file}'}
 
         metadata = load_metadata(info_file)
         details = prepare_video_details(metadata)
-        schedule_time = get_next_upload_time().isoformat() + 'Z'
+        schedule_time = get_next_upload_time().isoformat()
 
         youtube = authenticate_youtube()
 
@@ -134,16 +156,19 @@ def upload_video(video_file='output_video.mp4', info_file='yt_metadata.json'):
             body['status']['containsSyntheticMedia'] = True
 
         print(f"🚀 Uploading: {details['title']}")
-        media = MediaFileUpload(video_file, chunksize=5 * 1024 * 1024, resumable=True)
+        # Shorts are small: send them in one request, chunk only large files
+        size = os.path.getsize(video_file)
+        chunksize = -1 if size < 100 * 1024 * 1024 else 50 * 1024 * 1024
+        media = MediaFileUpload(video_file, chunksize=chunksize, resumable=True)
         request = youtube.videos().insert(part='snippet,status', body=body, media_body=media)
 
         response = None
+        last_reported = 0.0
         while response is None:
             status, response = request.next_chunk()
-            if status:
-                print(f"📤 Progress: {int(status.progress() * 100)}%")
-            else:
-                time.sleep(2)
+            if status and status.progress() - last_reported >= 0.05:
+                last_reported = status.progress()
+                print(f"📤 Progress: {int(last_reported * 100)}%")
 
         vid = response.get('id')
         print(f"\n✅ Upload done!")